@@ -3,6 +3,7 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Optional
 
 from src.api.models import (
@@ -95,7 +96,7 @@ async def get_all_cache_keys():
     for key, line in cache_manager.cache.items():
         cache_data[key] = {
             "state": line.state.value,
-            "last_access": line.last_access.isoformat(),
+            "last_access": datetime.fromtimestamp(line.last_access).isoformat(),
             "data": str(line.data)[:100]  
         }
     
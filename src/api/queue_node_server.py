@@ -3,6 +3,7 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Optional
 
 from src.api.models import (
@@ -108,11 +109,13 @@ async def dequeue_message(request: QueueDequeueRequest):
         message_data = await queue_manager.dequeue(request.queue_name)
         
         if message_data:
+            delivery_time = message_data.get("delivery_time")
             return QueueDequeueResponse(
                 success=True,
                 message=message_data.get("data"),
                 message_id=message_data.get("id"),
-                delivery_time=message_data.get("delivery_time")
+                # Internally an epoch float; the API keeps its ISO shape.
+                delivery_time=datetime.fromtimestamp(delivery_time).isoformat() if delivery_time else None
             )
         else:
             return QueueDequeueResponse(
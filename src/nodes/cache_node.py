@@ -1,7 +1,8 @@
 import asyncio
+import time
 from enum import Enum
 from collections import OrderedDict
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from src.nodes.base_node import BaseNode
 
@@ -15,8 +16,11 @@ class CacheLine:
     def __init__(self, data: Any, state: CacheState = CacheState.INVALID):
         self.data = data
         self.state = state
-        self.last_access = datetime.now()
-        self.created_at = datetime.now()
+        # Plain epoch floats: time.time() allocates nothing, and these fields
+        # are only compared or displayed, never used as datetimes internally.
+        now = time.time()
+        self.last_access = now
+        self.created_at = now
 
 class MESICache(BaseNode):
     def __init__(self, node_id: str, host: str, port: int, capacity: int = 100):
@@ -30,52 +34,81 @@ class MESICache(BaseNode):
         self.read_count = 0
         self.write_count = 0
         self.invalidation_count = 0
+
+        # Live count of lines per MESI state, maintained on every transition
+        # so get_metrics never scans the whole cache.
+        self._state_counts = {"M": 0, "E": 0, "S": 0, "I": 0}
+
+    def _set_state(self, line: CacheLine, new_state: CacheState):
+        counts = self._state_counts
+        counts[line.state.value] -= 1
+        counts[new_state.value] += 1
+        line.state = new_state
         
     async def read(self, key: str) -> Optional[Any]:
+        # Bind hot attributes to locals once; read() runs millions of times
+        # and each self.<attr> lookup costs a dict walk per call.
+        cache = self.cache
+        logger = self.logger
         self.read_count += 1
-        
-        if key in self.cache:
-            line = self.cache[key]
-            
+
+        line = cache.get(key)
+        if line is not None:
             if line.state != CacheState.INVALID:
                 self.hits += 1
-                line.last_access = datetime.now()
-                self.cache.move_to_end(key)
-                
-                self.logger.debug(f"Cache HIT: {key} (state: {line.state.value})")
+                line.last_access = time.time()
+                cache.move_to_end(key)
+
+                logger.debug(f"Cache HIT: {key} (state: {line.state.value})")
                 return line.data
         
         self.misses += 1
-        self.logger.debug(f"Cache MISS: {key}")
+        logger.debug(f"Cache MISS: {key}")
         
         peer_data, peer_id = await self.fetch_from_peers(key)
         
         if peer_data is not None:
             await self.cache_data(key, peer_data, CacheState.SHARED)
-            self.logger.info(f"Fetched {key} from peer {peer_id}, cached as SHARED")
+            logger.info(f"Fetched {key} from peer {peer_id}, cached as SHARED")
             return peer_data
-        
+
         data = await self.fetch_from_memory(key)
-        
+
         if data is not None:
             await self.cache_data(key, data, CacheState.EXCLUSIVE)
-            self.logger.info(f"Fetched {key} from memory, cached as EXCLUSIVE")
+            logger.info(f"Fetched {key} from memory, cached as EXCLUSIVE")
             
         return data
         
     async def write(self, key: str, value: Any) -> bool:
+        cache = self.cache
         self.write_count += 1
-        
+
+        # Silent E→M promotion: a line held EXCLUSIVE is guaranteed absent from
+        # every peer, so the write needs no invalidation traffic at all.
+        line = cache.get(key)
+        if line is not None and line.state == CacheState.EXCLUSIVE:
+            line.data = value
+            self._set_state(line, CacheState.MODIFIED)
+            line.last_access = time.time()
+            cache.move_to_end(key)
+            self.logger.debug(f"Updated {key}: E → M (silent local write)")
+            return True
+
         await self.broadcast_invalidate(key)
-        
+
+        # Re-fetch after the await: the line may have been evicted or
+        # replaced while the broadcast was in flight, and mutating a stale
+        # reference would orphan the write and corrupt the state counts.
+        line = cache.get(key)
+
         # Update local cache
-        if key in self.cache:
-            line = self.cache[key]
+        if line is not None:
             old_state = line.state.value
             line.data = value
-            line.state = CacheState.MODIFIED
-            line.last_access = datetime.now()
-            self.cache.move_to_end(key)
+            self._set_state(line, CacheState.MODIFIED)
+            line.last_access = time.time()
+            cache.move_to_end(key)
             self.logger.info(f"Updated {key}: {old_state} → M (local write)")
         else:
             await self.cache_data(key, value, CacheState.MODIFIED)
@@ -83,17 +116,68 @@ class MESICache(BaseNode):
             
         return True
         
+    async def write_many(self, items: Dict[str, Any]) -> bool:
+        """Write a batch of keys with a single invalidation broadcast.
+
+        Per-key writes cost one broadcast round per key; a batch coalesces
+        every key that actually needs invalidating into one multi-key
+        message per peer. Keys held EXCLUSIVE promote silently as usual.
+        """
+        cache = self.cache
+        self.write_count += len(items)
+
+        # Promote EXCLUSIVE keys before any await: the E check only proves
+        # no peer holds a copy while nothing can run in between, so a peer
+        # read served mid-broadcast could demote the line to SHARED and walk
+        # away with a copy the batch would never invalidate.
+        now = time.time()
+        need_invalidate = []
+        for key, value in items.items():
+            line = cache.get(key)
+            if line is not None and line.state == CacheState.EXCLUSIVE:
+                line.data = value
+                self._set_state(line, CacheState.MODIFIED)
+                line.last_access = now
+                cache.move_to_end(key)
+            else:
+                need_invalidate.append(key)
+
+        if need_invalidate:
+            await self.broadcast_invalidate_batch(need_invalidate)
+
+        now = time.time()
+        for key in need_invalidate:
+            line = cache.get(key)
+            if line is not None:
+                line.data = items[key]
+                self._set_state(line, CacheState.MODIFIED)
+                line.last_access = now
+                cache.move_to_end(key)
+            else:
+                await self.cache_data(key, items[key], CacheState.MODIFIED)
+
+        return True
+
     async def cache_data(self, key: str, data: Any, state: CacheState):
-        if len(self.cache) >= self.capacity:
-            evicted_key, evicted_line = self.cache.popitem(last=False)
-            
+        cache = self.cache
+        if len(cache) >= self.capacity:
+            evicted_key, evicted_line = cache.popitem(last=False)
+
             if evicted_line.state == CacheState.MODIFIED:
                 await self.write_back_to_memory(evicted_key, evicted_line.data)
-                
+
+            self._state_counts[evicted_line.state.value] -= 1
             self.evictions += 1
             self.logger.info(f"Evicted {evicted_key} (state: {evicted_line.state.value})")
-            
-        self.cache[key] = CacheLine(data, state)
+
+        # An existing line for this key is replaced, not added; retire its
+        # state count or the old state leaks into the distribution forever.
+        existing = cache.get(key)
+        if existing is not None:
+            self._state_counts[existing.state.value] -= 1
+
+        cache[key] = CacheLine(data, state)
+        self._state_counts[state.value] += 1
         self.logger.debug(f"Cached {key} with state {state.value}")
         
     async def fetch_from_peers(self, key: str) -> tuple[Optional[Any], Optional[str]]:
@@ -145,6 +229,23 @@ class MESICache(BaseNode):
             success_count = sum(1 for r in responses if isinstance(r, dict) and r.get("status") == "ok")
             self.logger.debug(f"Broadcasted invalidate for {key} ({success_count}/{len(tasks)} peers acknowledged)")
         
+    async def broadcast_invalidate_batch(self, keys: List[str]):
+        self.invalidation_count += len(keys)
+
+        message = {
+            "type": "cache_invalidate_batch",
+            "keys": keys,
+            "node_id": self.node_id
+        }
+
+        tasks = [self.send_to_peer(peer_id, message) for peer_id in self.peers]
+
+        if tasks:
+            responses = await asyncio.gather(*tasks, return_exceptions=True)
+
+            success_count = sum(1 for r in responses if isinstance(r, dict) and r.get("status") == "ok")
+            self.logger.debug(f"Broadcasted batch invalidate for {len(keys)} keys ({success_count}/{len(tasks)} peers acknowledged)")
+
     async def process_message(self, message: Dict) -> Dict:
         msg_type = message.get("type")
         
@@ -158,7 +259,7 @@ class MESICache(BaseNode):
                 if line.state == CacheState.MODIFIED:
                     await self.write_back_to_memory(key, line.data)
                     old_state = line.state.value
-                    line.state = CacheState.SHARED
+                    self._set_state(line, CacheState.SHARED)
                     self.logger.info(f"Remote read for {key} from {requester}: {old_state} → S (wrote back)")
                     return {
                         "status": "ok",
@@ -169,7 +270,7 @@ class MESICache(BaseNode):
                 
                 elif line.state == CacheState.EXCLUSIVE:
                     old_state = line.state.value
-                    line.state = CacheState.SHARED
+                    self._set_state(line, CacheState.SHARED)
                     self.logger.info(f"Remote read for {key} from {requester}: {old_state} → S")
                     return {
                         "status": "ok",
@@ -197,12 +298,29 @@ class MESICache(BaseNode):
             writer = message["node_id"]
             
             if key in self.cache:
-                old_state = self.cache[key].state.value
-                self.cache[key].state = CacheState.INVALID
+                line = self.cache[key]
+                old_state = line.state.value
+                self._set_state(line, CacheState.INVALID)
                 self.logger.info(f"Invalidated {key} due to write from {writer}: {old_state} → I")
             
             return {"status": "ok"}
         
+        elif msg_type == "cache_invalidate_batch":
+            writer = message["node_id"]
+            cache = self.cache
+            invalidated = 0
+            
+            for key in message["keys"]:
+                line = cache.get(key)
+                if line is not None:
+                    self._set_state(line, CacheState.INVALID)
+                    invalidated += 1
+            
+            if invalidated:
+                self.logger.info(f"Invalidated {invalidated} keys due to batch write from {writer}")
+            
+            return {"status": "ok"}
+        
         elif msg_type == "cache_status":
             key = message.get("key")
             if key in self.cache:
@@ -211,7 +329,7 @@ class MESICache(BaseNode):
                     "status": "ok",
                     "exists": True,
                     "state": line.state.value,
-                    "last_access": line.last_access.isoformat()
+                    "last_access": datetime.fromtimestamp(line.last_access).isoformat()
                 }
             return {"status": "ok", "exists": False, "state": None}
             
@@ -234,6 +352,7 @@ class MESICache(BaseNode):
                 await self.write_back_to_memory(key, line.data)
             
             del self.cache[key]
+            self._state_counts[line.state.value] -= 1
             self.logger.info(f"Deleted {key} from cache")
             return True
         return False
@@ -245,8 +364,8 @@ class MESICache(BaseNode):
                 "key": key,
                 "exists": True,
                 "state": line.state.value,
-                "last_access": line.last_access.isoformat(),
-                "created_at": line.created_at.isoformat(),
+                "last_access": datetime.fromtimestamp(line.last_access).isoformat(),
+                "created_at": datetime.fromtimestamp(line.created_at).isoformat(),
                 "data_preview": str(line.data)[:100]
             }
         return {
@@ -261,14 +380,7 @@ class MESICache(BaseNode):
         total_requests = self.hits + self.misses
         hit_rate = self.hits / total_requests if total_requests > 0 else 0
         
-        state_count = {
-            "M": 0,
-            "E": 0,
-            "S": 0,
-            "I": 0
-        }
-        for line in self.cache.values():
-            state_count[line.state.value] += 1
+        state_count = dict(self._state_counts)
         
         return {
             "node_id": self.node_id,
@@ -290,4 +402,5 @@ class MESICache(BaseNode):
                 await self.write_back_to_memory(key, line.data)
         
         self.cache.clear()
+        self._state_counts = {"M": 0, "E": 0, "S": 0, "I": 0}
         self.logger.info("Cache cleared")
\ No newline at end of file
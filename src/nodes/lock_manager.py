@@ -1,8 +1,10 @@
 from enum import Enum
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from typing import Dict, List, Optional, Set
-from datetime import datetime, timedelta
+from datetime import datetime
 import asyncio
+import heapq
+import time
 from src.consensus.raft import RaftNode, NodeState
 
 class LockType(Enum):
@@ -10,20 +12,27 @@ class LockType(Enum):
     EXCLUSIVE = "exclusive"
 
 class LockRequest:
-    def __init__(self, resource: str, lock_type: LockType, client_id: str, timestamp: datetime = None):
+    # Thousands of these sit in wait queues under contention; slots drop the
+    # per-instance __dict__ and speed up attribute access.
+    __slots__ = ("resource", "lock_type", "client_id", "timestamp", "timeout")
+
+    def __init__(self, resource: str, lock_type: LockType, client_id: str, timestamp: float = None):
         self.resource = resource
         self.lock_type = lock_type
         self.client_id = client_id
-        self.timestamp = timestamp or datetime.now()
-        self.timeout = None
+        # POSIX timestamps: replicated commands carry plain floats so followers
+        # never pay an isoformat parse when applying; display paths convert
+        # lazily via datetime.fromtimestamp.
+        self.timestamp = timestamp or time.time()
+        self.timeout: Optional[float] = None
     
     def to_dict(self):
         return {
             "resource": self.resource,
             "lock_type": self.lock_type.value,
             "client_id": self.client_id,
-            "timestamp": self.timestamp.isoformat(),
-            "timeout": self.timeout.isoformat() if self.timeout else None
+            "timestamp": self.timestamp,
+            "timeout": self.timeout
         }
     
     @classmethod
@@ -32,10 +41,10 @@ class LockRequest:
             data["resource"],
             LockType(data["lock_type"]),
             data["client_id"],
-            datetime.fromisoformat(data["timestamp"])
+            data["timestamp"]
         )
         if data.get("timeout"):
-            req.timeout = datetime.fromisoformat(data["timeout"])
+            req.timeout = data["timeout"]
         return req
 
 class DistributedLockManager(RaftNode):
@@ -43,15 +52,26 @@ class DistributedLockManager(RaftNode):
         super().__init__(node_id, host, port)
         
         self.locks: Dict[str, Dict] = {}
-        self.wait_queue: Dict[str, List[LockRequest]] = defaultdict(list)
+        # Wait queues are keyed by client_id: dict order preserves FIFO while
+        # removal of an arbitrary waiter (deadlock victim, duplicate request)
+        # stays O(1) instead of rebuilding a list.
+        self.wait_queue: Dict[str, OrderedDict] = defaultdict(OrderedDict)
         
         self.lock_graph: Dict[str, Set[str]] = defaultdict(set)
+        # Reverse edges (holder -> clients waiting on it) so removing a client
+        # from the graph touches only its own edges instead of every node.
+        self.lock_graph_rev: Dict[str, Set[str]] = defaultdict(set)
         
-        self.lock_timeouts: Dict[str, Dict[str, datetime]] = defaultdict(dict)
+        self.lock_timeouts: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._timeout_heap: List[tuple] = []
         
         self.lock_acquisition_times: List[float] = []
         self.deadlock_count = 0
         
+        # Resources whose wait queue is currently being drained; prevents
+        # overlapping releases from spawning redundant tasks.
+        self._draining: Set[str] = set()
+        
     async def start(self):
         await super().start()
         asyncio.create_task(self.cleanup_expired_locks())
@@ -74,7 +94,7 @@ class DistributedLockManager(RaftNode):
         
         request = LockRequest(resource, lock_type, client_id)
         if timeout_seconds:
-            request.timeout = datetime.now() + timedelta(seconds=timeout_seconds)
+            request.timeout = time.time() + timeout_seconds
         
         can_acquire, reason = self._can_acquire_lock(resource, lock_type, client_id)
         
@@ -84,9 +104,9 @@ class DistributedLockManager(RaftNode):
                 "request": request.to_dict()
             }
             
-            start_time = datetime.now()
+            start_time = time.monotonic()
             success = await self.replicate_command(command)
-            elapsed = (datetime.now() - start_time).total_seconds()
+            elapsed = time.monotonic() - start_time
             
             self.lock_acquisition_times.append(elapsed)
             
@@ -103,7 +123,7 @@ class DistributedLockManager(RaftNode):
                     "message": "Failed to replicate lock acquisition"
                 }
         else:
-            self.wait_queue[resource].append(request)
+            self.wait_queue[resource][client_id] = request
             self._update_lock_graph(client_id, resource)
             
             self.logger.info(f"Lock request queued: {resource} by {client_id} ({lock_type.value}) - {reason}")
@@ -188,32 +208,37 @@ class DistributedLockManager(RaftNode):
         if resource not in self.locks:
             self.locks[resource] = {
                 "type": request.lock_type,
-                "holders": {request.client_id},
+                "holders": frozenset((request.client_id,)),
                 "timestamp": request.timestamp
             }
         else:
-            self.locks[resource]["holders"].add(request.client_id)
+            # Copy-on-write: holders is a frozenset, so status polling and
+            # deadlock detection can snapshot it by reference without copying.
+            lock = self.locks[resource]
+            lock["holders"] = lock["holders"] | {request.client_id}
         
         if request.timeout:
             self.lock_timeouts[resource][request.client_id] = request.timeout
+            heapq.heappush(self._timeout_heap, (request.timeout, resource, request.client_id))
         
         if resource in self.wait_queue:
-            self.wait_queue[resource] = [
-                r for r in self.wait_queue[resource] 
-                if r.client_id != request.client_id
-            ]
+            self.wait_queue[resource].pop(request.client_id, None)
     
     def _apply_lock_release(self, resource: str, client_id: str):
         if resource in self.locks:
             lock = self.locks[resource]
-            lock["holders"].discard(client_id)
+            lock["holders"] = lock["holders"] - {client_id}
             
             if resource in self.lock_timeouts:
                 self.lock_timeouts[resource].pop(client_id, None)
             
             if not lock["holders"]:
                 del self.locks[resource]
-                asyncio.create_task(self.process_wait_queue(resource))
+                
+                # Only spawn a drain task when there is actually someone
+                # waiting and no drain is already in flight for this resource.
+                if self.wait_queue.get(resource) and resource not in self._draining:
+                    asyncio.create_task(self.process_wait_queue(resource))
             
             self._remove_from_lock_graph(client_id)
     
@@ -221,74 +246,114 @@ class DistributedLockManager(RaftNode):
         if resource not in self.wait_queue or not self.wait_queue[resource]:
             return
         
-        while self.wait_queue[resource]:
-            next_request = self.wait_queue[resource][0]
-            
-            can_acquire, _ = self._can_acquire_lock(
-                resource, 
-                next_request.lock_type, 
-                next_request.client_id
-            )
-            
-            if can_acquire:
-                self.wait_queue[resource].pop(0)
-                
-                command = {
-                    "operation": "acquire_lock",
-                    "request": next_request.to_dict()
-                }
-                await self.replicate_command(command)
-                
-                self.logger.info(f"Processed queued lock request: {resource} for {next_request.client_id}")
-                
-                if next_request.lock_type == LockType.EXCLUSIVE:
+        if resource in self._draining:
+            return
+        self._draining.add(resource)
+
+        try:
+            while self.wait_queue[resource]:
+                next_request = next(iter(self.wait_queue[resource].values()))
+
+                can_acquire, _ = self._can_acquire_lock(
+                    resource,
+                    next_request.lock_type,
+                    next_request.client_id
+                )
+
+                if can_acquire:
+                    self.wait_queue[resource].popitem(last=False)
+
+                    command = {
+                        "operation": "acquire_lock",
+                        "request": next_request.to_dict()
+                    }
+                    await self.replicate_command(command)
+
+                    self.logger.info(f"Processed queued lock request: {resource} for {next_request.client_id}")
+
+                    if next_request.lock_type == LockType.EXCLUSIVE:
+                        break
+                else:
                     break
-            else:
-                break
+        finally:
+            self._draining.discard(resource)
     
     async def detect_deadlock(self) -> List[List[str]]:
-        deadlocks = []
-        visited = set()
-        rec_stack = set()
-        
-        def dfs(node: str, path: List[str]) -> Optional[List[str]]:
-            if node in rec_stack:
-                cycle_start = path.index(node)
-                return path[cycle_start:]
-            
-            if node in visited:
-                return None
-            
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
-            
-            for neighbor in self.lock_graph.get(node, []):
-                cycle = dfs(neighbor, path.copy())
-                if cycle:
-                    return cycle
-            
-            rec_stack.remove(node)
-            return None
-        
-        for client in list(self.lock_graph.keys()):
-            if client not in visited:
-                cycle = dfs(client, [])
-                if cycle:
-                    deadlocks.append(cycle)
-                    self.deadlock_count += 1
-        
+        # Iterative Tarjan SCC over the wait-for graph: one O(V+E) pass finds
+        # every non-trivial strongly-connected component, i.e. all concurrent
+        # deadlock cycles, instead of one cycle per detection round.
+        graph = self.lock_graph
+        deadlocks: List[List[str]] = []
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        scc_stack: List[str] = []
+        counter = 0
+
+        for root in list(graph.keys()):
+            if root in index:
+                continue
+
+            index[root] = lowlink[root] = counter
+            counter += 1
+            scc_stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph.get(root, ())))]
+
+            while work:
+                node, neighbors = work[-1]
+                advanced = False
+
+                for neighbor in neighbors:
+                    if neighbor not in index:
+                        index[neighbor] = lowlink[neighbor] = counter
+                        counter += 1
+                        scc_stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work.append((neighbor, iter(graph.get(neighbor, ()))))
+                        advanced = True
+                        break
+                    if neighbor in on_stack and index[neighbor] < lowlink[node]:
+                        lowlink[node] = index[neighbor]
+
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+
+                if lowlink[node] == index[node]:
+                    scc = []
+                    while True:
+                        member = scc_stack.pop()
+                        on_stack.discard(member)
+                        scc.append(member)
+                        if member == node:
+                            break
+
+                    if len(scc) > 1:
+                        deadlocks.append(scc)
+                        self.deadlock_count += 1
+
         return deadlocks
     
     def _update_lock_graph(self, client_id: str, resource: str):
         if resource in self.locks:
             holders = self.locks[resource]["holders"]
             self.lock_graph[client_id].update(holders)
+            for holder in holders:
+                self.lock_graph_rev[holder].add(client_id)
     
     def _remove_from_lock_graph(self, client_id: str):
-        self.lock_graph.pop(client_id, None)
+        waited_on = self.lock_graph.pop(client_id, None)
+        if waited_on:
+            for holder in waited_on:
+                self.lock_graph_rev[holder].discard(client_id)
         
-        for waiting_client in self.lock_graph:
+        for waiting_client in self.lock_graph_rev.pop(client_id, ()):
             self.lock_graph[waiting_client].discard(client_id)
     
     async def resolve_deadlock(self, cycle: List[str]) -> Dict:
@@ -299,18 +364,15 @@ class DistributedLockManager(RaftNode):
         latest_timestamp = None
         
         for resource, waiters in self.wait_queue.items():
-            for waiter in waiters:
+            for waiter in waiters.values():
                 if waiter.client_id in cycle:
                     if latest_timestamp is None or waiter.timestamp > latest_timestamp:
                         latest_timestamp = waiter.timestamp
                         victim = waiter.client_id
         
         if victim:
-            for resource in list(self.wait_queue.keys()):
-                self.wait_queue[resource] = [
-                    r for r in self.wait_queue[resource] 
-                    if r.client_id != victim
-                ]
+            for waiters in self.wait_queue.values():
+                waiters.pop(victim, None)
             self._remove_from_lock_graph(victim)
             
             self.logger.warning(f"Deadlock resolved: aborted client {victim} from cycle {' -> '.join(cycle)}")
@@ -326,6 +388,10 @@ class DistributedLockManager(RaftNode):
     
     async def periodic_deadlock_detection(self):
         while self.running:
+            if self.state != NodeState.LEADER:
+                await self._leader_event.wait()
+                continue
+            
             await asyncio.sleep(5)
             
             if self.is_leader():
@@ -339,20 +405,33 @@ class DistributedLockManager(RaftNode):
     
     async def cleanup_expired_locks(self):
         while self.running:
-            await asyncio.sleep(1)
+            if self.state != NodeState.LEADER:
+                # Followers park until promotion instead of waking every
+                # second just to check is_leader().
+                await self._leader_event.wait()
+                continue
             
+            # Sleep until the earliest pending expiry, capped at 1s so newly
+            # acquired locks with shorter timeouts are picked up promptly.
+            delay = 1.0
+            if self._timeout_heap and self.is_leader():
+                next_expiry = self._timeout_heap[0][0]
+                delay = min(delay, max(next_expiry - time.time(), 0.01))
+            await asyncio.sleep(delay)
+
             if not self.is_leader():
                 continue
-            
-            current_time = datetime.now()
-            expired = []
-            
-            for resource, timeouts in list(self.lock_timeouts.items()):
-                for client_id, timeout in list(timeouts.items()):
-                    if current_time > timeout:
-                        expired.append((resource, client_id))
-            
-            for resource, client_id in expired:
+
+            current_time = time.time()
+
+            while self._timeout_heap and self._timeout_heap[0][0] <= current_time:
+                timeout, resource, client_id = heapq.heappop(self._timeout_heap)
+
+                # Lazy deletion: skip entries superseded by release or a
+                # re-acquire with a different timeout.
+                if self.lock_timeouts.get(resource, {}).get(client_id) != timeout:
+                    continue
+
                 self.logger.info(f"Lock timeout expired: {resource} by {client_id}")
                 await self.release_lock(resource, client_id)
     
@@ -364,7 +443,7 @@ class DistributedLockManager(RaftNode):
                     "resource": resource,
                     "type": lock["type"].value,
                     "holders": list(lock["holders"]),
-                    "timestamp": lock["timestamp"].isoformat(),
+                    "timestamp": datetime.fromtimestamp(lock["timestamp"]).isoformat(),
                     "waiting": len(self.wait_queue.get(resource, []))
                 }
             return {"resource": resource, "status": "available"}
@@ -374,7 +453,7 @@ class DistributedLockManager(RaftNode):
                 res: {
                     "type": lock["type"].value,
                     "holders": list(lock["holders"]),
-                    "timestamp": lock["timestamp"].isoformat(),
+                    "timestamp": datetime.fromtimestamp(lock["timestamp"]).isoformat(),
                     "waiting": len(self.wait_queue.get(res, []))
                 }
                 for res, lock in self.locks.items()
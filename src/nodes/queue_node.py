@@ -1,85 +1,140 @@
+import bisect
 import hashlib
+import heapq
+import mmap
+import time
 from collections import defaultdict, deque
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-import json
+import orjson
 import os
 import asyncio
-import aiofiles
 from src.nodes.base_node import BaseNode
 
+# Conservative portable bound on iovec count per writev call (POSIX minimum
+# is 16, Linux allows 1024).
+_IOV_MAX = 1024
+
 class ConsistentHash:
     def __init__(self, nodes: List[str], virtual_nodes: int = 150):
         self.virtual_nodes = virtual_nodes
         self.ring = {}
         self.sorted_keys = []
-        
+        self._node_hashes: Dict[str, List[int]] = {}
+
         for node in nodes:
             self.add_node(node)
             
     def _hash(self, key: str) -> int:
-        return int(hashlib.md5(key.encode()).hexdigest(), 16)
+        return self._hash_bytes(key.encode())
+
+    @staticmethod
+    def _hash_bytes(key: bytes) -> int:
+        # blake2b with an 8-byte digest is much cheaper than md5 and skips the
+        # hex round-trip; cryptographic strength is irrelevant for ring placement.
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big')
         
     def add_node(self, node: str):
-        for i in range(self.virtual_nodes):
-            virtual_key = f"{node}:{i}"
-            hash_key = self._hash(virtual_key)
-            self.ring[hash_key] = node
-            
-        self.sorted_keys = sorted(self.ring.keys())
-        
+        # Encode the node name once and build each virtual key directly in
+        # bytes; no per-key f-string or str.encode in the loop.
+        _hash_bytes = self._hash_bytes
+        node_bytes = node.encode()
+        hashes = [_hash_bytes(b'%s:%d' % (node_bytes, i)) for i in range(self.virtual_nodes)]
+        self._node_hashes[node] = hashes
+
+        ring = self.ring
+        sorted_keys = self.sorted_keys
+        for hash_key in hashes:
+            ring[hash_key] = node
+            bisect.insort(sorted_keys, hash_key)
+
     def remove_node(self, node: str):
-        for i in range(self.virtual_nodes):
-            virtual_key = f"{node}:{i}"
-            hash_key = self._hash(virtual_key)
-            if hash_key in self.ring:
-                del self.ring[hash_key]
-                
-        self.sorted_keys = sorted(self.ring.keys())
+        to_remove = set(self._node_hashes.pop(node, ()))
+        if not to_remove:
+            return
+
+        for hash_key in to_remove:
+            self.ring.pop(hash_key, None)
+
+        # One filtering pass beats re-sorting the surviving keys.
+        self.sorted_keys = [k for k in self.sorted_keys if k not in to_remove]
         
     def get_node(self, key: str) -> Optional[str]:
         if not self.ring:
             return None
-            
+
         hash_key = self._hash(key)
-        
-        for ring_key in self.sorted_keys:
-            if hash_key <= ring_key:
-                return self.ring[ring_key]
-                
-        return self.ring[self.sorted_keys[0]]
+
+        # Binary search for the successor ring key; wrap to the start of the
+        # ring when the hash falls past the last virtual node.
+        idx = bisect.bisect_left(self.sorted_keys, hash_key)
+        if idx == len(self.sorted_keys):
+            idx = 0
+        return self.ring[self.sorted_keys[idx]]
 
 class DistributedQueue(BaseNode):
-    def __init__(self, node_id: str, host: str, port: int, immediate_mode: bool = False):
+    def __init__(self, node_id: str, host: str, port: int, immediate_mode: bool = False,
+                 log_dir: str = "logs"):
         super().__init__(node_id, host, port)
         self.queues: Dict[str, deque] = defaultdict(deque)
         
-        self.log_path = f"logs/{self.node_id}_queue.log"
-        os.makedirs("logs", exist_ok=True)
+        # log_dir is overridable so tests can point the WAL at a temp
+        # directory (e.g. tmp_path) instead of sharing logs/ across runs.
+        self.log_path = os.path.join(log_dir, f"{self.node_id}_queue.log")
+        os.makedirs(log_dir, exist_ok=True)
         
         self.consistent_hash = None
+        # queue_name -> owning node, memoized so hot queues skip the ring
+        # hash+bisect on every enqueue/dequeue. Reset whenever the ring changes.
+        self._queue_node_cache: Dict[str, str] = {}
         self.message_id_counter = 0
+        self._msg_id_prefix = f"{self.node_id}-"
         
         self.in_flight: Dict[str, Dict] = {}
-        self.visibility_timeout = timedelta(seconds=30)
+        # Per-queue in-flight counts so queue_status never scans in_flight.
+        self.in_flight_by_queue: Dict[str, int] = defaultdict(int)
+        self.visibility_timeout = 30.0
+        # (expiry, msg_id) min-heap so the reaper only touches messages that
+        # are actually due instead of scanning all of in_flight.
+        self._inflight_heap: List[tuple] = []
         
         self.immediate_mode = immediate_mode
         
         self.wal_buffer = []
         self.wal_buffer_size = 0
         self.wal_max_buffer = 1024 * 1024
-        self.wal_flush_interval = 0.1 
+        self.wal_flush_interval = 0.1
         self.wal_lock = asyncio.Lock()
+        self._wal_fd = None
+
+        self.wal_compact_interval = 30.0
+        self.wal_compact_threshold = 10 * 1024 * 1024
         
         self.enqueue_batch = []
         self.batch_size = 50
         self.batch_timeout = 0.01  
+
+        # Set whenever messages land on a local queue (enqueue, batch drain,
+        # or visibility-timeout requeue). Consumers can clear-then-wait on it
+        # instead of polling empty queues with sleeps; dequeue itself stays
+        # non-blocking.
+        self.message_available = asyncio.Event()
         
     def initialize_consistent_hash(self):
         nodes = [self.node_id] + list(self.peers.keys())
         self.consistent_hash = ConsistentHash(nodes)
+        self._queue_node_cache.clear()
         self.logger.info(f"Consistent hash ring initialized with nodes: {nodes}")
     
+    def _route_queue(self, queue_name: str) -> str:
+        if not self.consistent_hash:
+            raise RuntimeError("Consistent hash not initialized.")
+        
+        target_node = self._queue_node_cache.get(queue_name)
+        if target_node is None:
+            target_node = self.consistent_hash.get_node(queue_name)
+            self._queue_node_cache[queue_name] = target_node
+        return target_node
+    
     async def start(self):
         await super().start()
         
@@ -87,34 +142,131 @@ class DistributedQueue(BaseNode):
             asyncio.create_task(self._flush_wal_periodically())
             asyncio.create_task(self._process_enqueue_batches())
             asyncio.create_task(self._check_in_flight_timeouts())
+            asyncio.create_task(self._compact_wal_periodically())
     
     async def _append_to_log(self, data: Dict):
-        async with self.wal_lock:
-            entry = json.dumps(data) + '\n'
-            self.wal_buffer.append(entry)
-            self.wal_buffer_size += len(entry)
-            
-            if self.immediate_mode or self.wal_buffer_size >= self.wal_max_buffer:
-                await self._flush_wal()
+        # The event loop is single-threaded and list.append is atomic under
+        # the GIL, so producers append lock-free; only flushes serialize.
+        entry = orjson.dumps(data) + b'\n'
+        self.wal_buffer.append(entry)
+        self.wal_buffer_size += len(entry)
+        
+        if self.immediate_mode or self.wal_buffer_size >= self.wal_max_buffer:
+            await self._flush_wal()
     
     async def _flush_wal(self):
         if not self.wal_buffer:
             return
-        
-        try:
-            async with aiofiles.open(self.log_path, mode='a') as f:
-                await f.writelines(self.wal_buffer)
-            
-            self.wal_buffer.clear()
+
+        async with self.wal_lock:
+            buf = self.wal_buffer
+            if not buf:
+                return
+
+            # Swap the buffer out in one step; appends landing while the
+            # write is in flight go to the fresh list and ride the next flush.
+            self.wal_buffer = []
             self.wal_buffer_size = 0
-        except Exception as e:
-            self.logger.error(f"Failed to flush WAL: {e}")
+
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write_wal_sync, buf)
+            except Exception as e:
+                # Put the batch back at the front of the buffer (still under
+                # wal_lock) so a transient failure is retried on the next
+                # flush rather than losing acknowledged entries.
+                self.wal_buffer[:0] = buf
+                self.wal_buffer_size += sum(map(len, buf))
+                self.logger.error(f"Failed to flush WAL, retrying {len(buf)} entries on next flush: {e}")
+
+    def _write_wal_sync(self, bufs: List[bytes]):
+        # Append fd kept open for the node's lifetime. os.writev lands the
+        # whole batch in one syscall straight from the entry list, with no
+        # intermediate join; the WAL is strictly sequential so one executor
+        # hop per batch is all the async machinery we need.
+        if self._wal_fd is None:
+            self._wal_fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+        fd = self._wal_fd
+        for i in range(0, len(bufs), _IOV_MAX):
+            chunk = bufs[i:i + _IOV_MAX]
+            written = os.writev(fd, chunk)
+            if written != sum(map(len, chunk)):
+                # Short writes on a regular file are rare (disk full, signals);
+                # fall back to plain writes for the remainder.
+                rest = b''.join(chunk)[written:]
+                while rest:
+                    rest = rest[os.write(fd, rest):]
+
+    async def stop(self):
+        await self._flush_wal()
+
+        async with self.wal_lock:
+            if self._wal_fd is not None:
+                os.close(self._wal_fd)
+                self._wal_fd = None
+
+        await super().stop()
     
     async def _flush_wal_periodically(self):
         while self.running:
             await asyncio.sleep(self.wal_flush_interval)
+            await self._flush_wal()
+
+    async def _compact_wal_periodically(self):
+        while self.running:
+            await asyncio.sleep(self.wal_compact_interval)
+
+            try:
+                if os.path.getsize(self.log_path) < self.wal_compact_threshold:
+                    continue
+            except OSError:
+                continue
+
             async with self.wal_lock:
-                await self._flush_wal()
+                await self._compact_log()
+
+    async def _compact_log(self):
+        """Rewrite the WAL with only live messages.
+
+        The append-only log otherwise grows without bound even when nearly
+        every message has been acked, making recovery O(history). The
+        in-memory queues plus in_flight are the authoritative live set, so a
+        snapshot of them replaces the full history. Caller must hold wal_lock.
+        """
+        entries = []
+        for queue in self.queues.values():
+            for message_data in queue:
+                entries.append(orjson.dumps({"type": "ENQUEUE", "payload": message_data}) + b'\n')
+
+        for message_data in self.in_flight.values():
+            # In-flight messages go back as plain queue entries; their
+            # delivery bookkeeping is meaningless after a restart.
+            payload = {k: v for k, v in message_data.items()
+                       if k not in ('delivery_time', 'visibility_timeout')}
+            entries.append(orjson.dumps({"type": "ENQUEUE", "payload": payload}) + b'\n')
+
+        # Buffered-but-unflushed records describe state already captured in
+        # the snapshot, so the buffer is dropped rather than flushed.
+        self.wal_buffer.clear()
+        self.wal_buffer_size = 0
+
+        if self._wal_fd is not None:
+            os.close(self._wal_fd)
+            self._wal_fd = None
+
+        def write_snapshot():
+            tmp_path = self.log_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.writelines(entries)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.log_path)
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, write_snapshot)
+            self.logger.info(f"Compacted WAL to {len(entries)} live entries")
+        except Exception as e:
+            self.logger.error(f"Failed to compact WAL: {e}")
     
     async def _process_enqueue_batches(self):
         while self.running:
@@ -125,26 +277,39 @@ class DistributedQueue(BaseNode):
             
             batch = self.enqueue_batch[:self.batch_size]
             self.enqueue_batch = self.enqueue_batch[self.batch_size:]
-            
+
+            # Group the batch per queue and extend each deque once, then land
+            # the whole batch in the WAL buffer as a single pre-joined entry
+            # instead of one append (and potential flush check) per message.
+            by_queue: Dict[str, List[Dict]] = defaultdict(list)
             for message_data in batch:
-                queue_name = message_data["queue"]
-                self.queues[queue_name].append(message_data)
-                await self._append_to_log({"type": "ENQUEUE", "payload": message_data})
+                by_queue[message_data["queue"]].append(message_data)
+
+            for queue_name, messages in by_queue.items():
+                self.queues[queue_name].extend(messages)
+            self.message_available.set()
+
+            blob = b''.join(
+                orjson.dumps({"type": "ENQUEUE", "payload": message_data}) + b'\n'
+                for message_data in batch
+            )
+            self.wal_buffer.append(blob)
+            self.wal_buffer_size += len(blob)
+
+            if self.immediate_mode or self.wal_buffer_size >= self.wal_max_buffer:
+                await self._flush_wal()
     
     async def enqueue(self, queue_name: str, message: Any) -> str:
         self.message_id_counter += 1
-        msg_id = f"{self.node_id}-{self.message_id_counter}"
+        msg_id = self._msg_id_prefix + str(self.message_id_counter)
         
-        if not self.consistent_hash:
-            raise RuntimeError("Consistent hash not initialized.")
-            
-        target_node = self.consistent_hash.get_node(queue_name)
+        target_node = self._route_queue(queue_name)
         
         message_data = {
             "id": msg_id,
             "queue": queue_name,
             "data": message,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": time.time()
         }
         
         if target_node == self.node_id:
@@ -161,19 +326,19 @@ class DistributedQueue(BaseNode):
                 "data": message_data
             }))
             
-        self.logger.info(f"Message {msg_id} routed to node {target_node} for queue {queue_name}")
+        # Per-message log lines are hot-path cost even when the handler
+        # filters them; %-style args defer formatting until a handler wants it.
+        self.logger.debug("Message %s routed to node %s for queue %s", msg_id, target_node, queue_name)
         return msg_id
     
     async def _local_enqueue(self, message_data: Dict):
         queue_name = message_data["queue"]
         self.queues[queue_name].append(message_data)
+        self.message_available.set()
         await self._append_to_log({"type": "ENQUEUE", "payload": message_data})
     
     async def dequeue(self, queue_name: str) -> Optional[Dict]:
-        if not self.consistent_hash:
-            raise RuntimeError("Consistent hash not initialized.")
-            
-        target_node = self.consistent_hash.get_node(queue_name)
+        target_node = self._route_queue(queue_name)
         
         if target_node == self.node_id:
             return self._local_dequeue(queue_name)
@@ -189,44 +354,60 @@ class DistributedQueue(BaseNode):
             message = self.queues[queue_name].popleft()
             msg_id = message['id']
             
-            message['delivery_time'] = datetime.now().isoformat()
-            message['visibility_timeout'] = (datetime.now() + self.visibility_timeout).isoformat()
+            now = time.time()
+            expiry = now + self.visibility_timeout
+            message['delivery_time'] = now
+            message['visibility_timeout'] = expiry
             self.in_flight[msg_id] = message
+            self.in_flight_by_queue[queue_name] += 1
+            heapq.heappush(self._inflight_heap, (expiry, msg_id))
             
-            self.logger.info(f"Message {msg_id} delivered from {queue_name}, awaiting acknowledgement.")
+            self.logger.debug("Message %s delivered from %s, awaiting acknowledgement.", msg_id, queue_name)
             return message
         return None
     
     async def ack_message(self, msg_id: str) -> bool:
-        if msg_id in self.in_flight:
-            del self.in_flight[msg_id]
+        message = self.in_flight.pop(msg_id, None)
+        if message is not None:
+            self.in_flight_by_queue[message['queue']] -= 1
             await self._append_to_log({"type": "ACK", "msg_id": msg_id})
-            self.logger.info(f"Message {msg_id} acknowledged and permanently removed.")
+            self.logger.debug("Message %s acknowledged and permanently removed.", msg_id)
             return True
         self.logger.warning(f"ACK received for unknown or timed-out message ID: {msg_id}")
         return False
     
     async def _check_in_flight_timeouts(self):
         while self.running:
-            await asyncio.sleep(5)
-            
-            current_time = datetime.now()
-            expired = []
+            # Sleep until the earliest pending expiry, capped at 5s so fresh
+            # deliveries with shorter timeouts are noticed promptly.
+            delay = 5.0
+            if self._inflight_heap:
+                next_expiry = self._inflight_heap[0][0]
+                delay = min(delay, max(next_expiry - time.time(), 0.01))
+            await asyncio.sleep(delay)
             
-            for msg_id, message in list(self.in_flight.items()):
-                timeout_str = message.get('visibility_timeout')
-                if timeout_str:
-                    timeout = datetime.fromisoformat(timeout_str)
-                    if current_time > timeout:
-                        expired.append((msg_id, message))
+            current_time = time.time()
             
-            for msg_id, message in expired:
+            while self._inflight_heap and self._inflight_heap[0][0] <= current_time:
+                expiry, msg_id = heapq.heappop(self._inflight_heap)
+                
+                message = self.in_flight.get(msg_id)
+                if message is None:
+                    continue
+                
+                # Skip stale heap entries from an earlier delivery of a
+                # message that has since been redelivered with a later expiry.
+                if message.get('visibility_timeout', 0) > expiry:
+                    continue
+                
                 del self.in_flight[msg_id]
                 queue_name = message['queue']
+                self.in_flight_by_queue[queue_name] -= 1
                 
                 message.pop('delivery_time', None)
                 message.pop('visibility_timeout', None)
                 self.queues[queue_name].append(message)
+                self.message_available.set()
                 
                 self.logger.warning(f"Message {msg_id} timed out, requeued to {queue_name}")
         
@@ -246,7 +427,7 @@ class DistributedQueue(BaseNode):
         elif msg_type == "queue_status": 
             queue_name = message["queue"]
             size = len(self.queues.get(queue_name, []))
-            in_flight = len([m for m in self.in_flight.values() if m.get("queue") == queue_name])
+            in_flight = self.in_flight_by_queue.get(queue_name, 0)
             return {
                 "queue_name": queue_name,
                 "size": size,
@@ -258,29 +439,46 @@ class DistributedQueue(BaseNode):
         
     async def recover_from_log(self):
         self.logger.info(f"Recovering queue state from {self.log_path}...")
-        temp_queues = defaultdict(dict)
-        acked_ids = set()
-        
+
         try:
-            async with aiofiles.open(self.log_path, mode='r') as f:
-                async for line in f:
-                    if not line.strip(): 
+            live = await asyncio.get_running_loop().run_in_executor(None, self._parse_log_sync)
+        except FileNotFoundError:
+            self.logger.warning(f"Log file not found at {self.log_path}, starting with a fresh state.")
+            return
+
+        # live preserves insertion order, so messages land back in their
+        # queues in original enqueue order.
+        for msg_data in live.values():
+            self.queues[msg_data['queue']].append(msg_data)
+
+        self.logger.info(f"Recovery complete. Recovered {len(live)} active messages.")
+
+    def _parse_log_sync(self) -> Dict[str, Dict]:
+        # mmap the whole log and split lines in C rather than hopping through
+        # the executor once per line; recovery runs once at startup and is
+        # parse-bound, not I/O bound.
+        live: Dict[str, Dict] = {}
+        acked_ids = set()
+        loads = orjson.loads
+
+        with open(self.log_path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return live
+
+            with mm:
+                for line in iter(mm.readline, b''):
+                    if line == b'\n':
                         continue
-                    log_entry = json.loads(line)
-                    
+                    log_entry = loads(line)
+
                     if log_entry['type'] == 'ENQUEUE':
                         msg = log_entry['payload']
-                        temp_queues[msg['queue']][msg['id']] = msg
+                        if msg['id'] not in acked_ids:
+                            live[msg['id']] = msg
                     elif log_entry['type'] == 'ACK':
+                        live.pop(log_entry['msg_id'], None)
                         acked_ids.add(log_entry['msg_id'])
-            
-            recovered_count = 0
-            for queue_name, messages in temp_queues.items():
-                for msg_id, msg_data in messages.items():
-                    if msg_id not in acked_ids:
-                        self.queues[queue_name].append(msg_data)
-                        recovered_count += 1
-            
-            self.logger.info(f"Recovery complete. Recovered {recovered_count} active messages.")
-        except FileNotFoundError:
-            self.logger.warning(f"Log file not found at {self.log_path}, starting with a fresh state.")
\ No newline at end of file
+
+        return live
\ No newline at end of file
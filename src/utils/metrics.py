@@ -1,10 +1,15 @@
 import time
-from collections import defaultdict
-from typing import Dict, List
+from collections import defaultdict, deque
+from typing import Deque, Dict
+
+# Per-series sample cap. Long-running nodes record latencies indefinitely;
+# a bounded deque keeps memory flat and the summary reflects recent
+# behaviour instead of the full process history.
+MAX_SAMPLES = 65536
 
 class MetricsCollector:
     def __init__(self):
-        self.metrics: Dict[str, List[float]] = defaultdict(list)
+        self.metrics: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
         self.counters: Dict[str, int] = defaultdict(int)
         
     def record_latency(self, operation: str, latency: float):
@@ -18,14 +23,18 @@ class MetricsCollector:
         
         for metric, values in self.metrics.items():
             if values:
+                # One sort serves every percentile, and min/max fall out of
+                # the sorted copy for free.
+                ordered = sorted(values)
+                n = len(ordered)
                 summary[metric] = {
-                    "count": len(values),
-                    "mean": sum(values) / len(values),
-                    "min": min(values),
-                    "max": max(values),
-                    "p50": sorted(values)[len(values) // 2],
-                    "p95": sorted(values)[int(len(values) * 0.95)],
-                    "p99": sorted(values)[int(len(values) * 0.99)]
+                    "count": n,
+                    "mean": sum(ordered) / n,
+                    "min": ordered[0],
+                    "max": ordered[-1],
+                    "p50": ordered[n // 2],
+                    "p95": ordered[int(n * 0.95)],
+                    "p99": ordered[int(n * 0.99)]
                 }
                 
         summary["counters"] = dict(self.counters)
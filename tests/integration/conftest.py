@@ -0,0 +1,49 @@
+import asyncio
+import pytest_asyncio
+
+@pytest_asyncio.fixture
+async def make_cluster():
+    """Build a wired cluster of nodes and tear it down after the test.
+
+    Collapses the per-test boilerplate: construct the nodes, add peers
+    pairwise, install a dict-based send_to_peer mock, and start everything.
+    Clusters stay function-scoped because the tests mutate cluster state
+    (stopping nodes, forcing leadership), which would leak between tests
+    under a shared module-scoped cluster.
+    """
+    clusters = []
+
+    async def _make(node_cls, count, base_port, id_prefix="node"):
+        nodes = [node_cls(f"{id_prefix}_{i}", "localhost", base_port + i)
+                 for i in range(count)]
+
+        peer_map = {n.node_id: n for n in nodes}
+
+        async def send(peer_id, message):
+            dest = peer_map.get(peer_id)
+            return await dest.process_message(message) if dest else None
+
+        for i, node in enumerate(nodes):
+            # Staggered timeouts make the first election converge quickly.
+            if hasattr(node, "election_timeout"):
+                node.election_timeout = 0.15 + (i * 0.05)
+
+            for peer in nodes:
+                if peer is not node:
+                    node.add_peer(peer.node_id, peer.host, peer.port)
+            node.send_to_peer = send
+
+        await asyncio.gather(*(node.start() for node in nodes))
+
+        clusters.append(nodes)
+        return nodes
+
+    yield _make
+
+    for nodes in clusters:
+        for node in nodes:
+            node.running = False
+
+        # Stop everything in parallel; stop() flushes state itself, so no
+        # grace-period sleep is needed before it.
+        await asyncio.gather(*(node.stop() for node in nodes), return_exceptions=True)
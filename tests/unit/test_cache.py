@@ -66,4 +66,25 @@ async def test_mesi_state_transitions():
     await cache.write("key_1", "value_1")
     assert cache.cache["key_1"].state == CacheState.MODIFIED
     
-    await cache.read("key_1")
\ No newline at end of file
+    await cache.read("key_1")
+
+@pytest.mark.asyncio
+async def test_cache_write_many_single_broadcast():
+    cache = MESICache("cache_node", "localhost", 8000)
+    cache.add_peer("peer_1", "localhost", 8001)
+    
+    sent = []
+    
+    async def mock_send(peer_id, message):
+        sent.append(message)
+        return {"status": "ok"}
+    
+    cache.send_to_peer = mock_send
+    
+    result = await cache.write_many({"key_1": "a", "key_2": "b", "key_3": "c"})
+    
+    assert result == True
+    assert len(sent) == 1
+    assert sorted(sent[0]["keys"]) == ["key_1", "key_2", "key_3"]
+    for key in ("key_1", "key_2", "key_3"):
+        assert cache.cache[key].state == CacheState.MODIFIED
@@ -2,90 +2,62 @@ import pytest
 from src.nodes.lock_manager import DistributedLockManager, LockType
 from src.consensus.raft import NodeState
 
-@pytest.mark.asyncio
-async def test_acquire_exclusive_lock():
+@pytest.fixture
+def lock_mgr():
+    """A leader lock manager with replication stubbed to local apply.
+
+    Every test repeated this setup; the fixture stays function-scoped so
+    each test gets empty lock tables without needing a reset step.
+    """
     manager = DistributedLockManager("lock_mgr", "localhost", 8000)
     manager.state = NodeState.LEADER
-    
+
     async def mock_replicate(command):
         await manager.apply_to_state_machine(command)
         return True
-    
+
     manager.replicate_command = mock_replicate
-    
-    result = await manager.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
+    return manager
+
+@pytest.mark.asyncio
+async def test_acquire_exclusive_lock(lock_mgr):
+    result = await lock_mgr.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
     assert result["success"] == True
-    assert "resource_1" in manager.locks
+    assert "resource_1" in lock_mgr.locks
 
 @pytest.mark.asyncio
-async def test_shared_locks():
-    manager = DistributedLockManager("lock_mgr", "localhost", 8000)
-    manager.state = NodeState.LEADER
-    
-    async def mock_replicate(command):
-        await manager.apply_to_state_machine(command)
-        return True
-    
-    manager.replicate_command = mock_replicate
-    
-    result1 = await manager.acquire_lock("resource_1", LockType.SHARED, "client_1")
+async def test_shared_locks(lock_mgr):
+    result1 = await lock_mgr.acquire_lock("resource_1", LockType.SHARED, "client_1")
     assert result1["success"] == True
-    
-    result2 = await manager.acquire_lock("resource_1", LockType.SHARED, "client_2")
+
+    result2 = await lock_mgr.acquire_lock("resource_1", LockType.SHARED, "client_2")
     assert result2["success"] == True
-    
-    assert len(manager.locks["resource_1"]["holders"]) == 2
+
+    assert len(lock_mgr.locks["resource_1"]["holders"]) == 2
 
 @pytest.mark.asyncio
-async def test_exclusive_blocks_shared():
-    manager = DistributedLockManager("lock_mgr", "localhost", 8000)
-    manager.state = NodeState.LEADER
-    
-    async def mock_replicate(command):
-        await manager.apply_to_state_machine(command)
-        return True
-    
-    manager.replicate_command = mock_replicate
-    
-    await manager.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
-    
-    result = await manager.acquire_lock("resource_1", LockType.SHARED, "client_2")
+async def test_exclusive_blocks_shared(lock_mgr):
+    await lock_mgr.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
+
+    result = await lock_mgr.acquire_lock("resource_1", LockType.SHARED, "client_2")
     assert result["success"] == False
-    assert len(manager.wait_queue["resource_1"]) == 1
+    assert len(lock_mgr.wait_queue["resource_1"]) == 1
 
 @pytest.mark.asyncio
-async def test_lock_release():
-    manager = DistributedLockManager("lock_mgr", "localhost", 8000)
-    manager.state = NodeState.LEADER
-    
-    async def mock_replicate(command):
-        await manager.apply_to_state_machine(command)
-        return True
-    
-    manager.replicate_command = mock_replicate
-    
-    await manager.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
-    result = await manager.release_lock("resource_1", "client_1")
-    
+async def test_lock_release(lock_mgr):
+    await lock_mgr.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
+    result = await lock_mgr.release_lock("resource_1", "client_1")
+
     assert result["success"] == True
-    assert "resource_1" not in manager.locks
+    assert "resource_1" not in lock_mgr.locks
 
 @pytest.mark.asyncio
-async def test_deadlock_detection():
-    manager = DistributedLockManager("lock_mgr", "localhost", 8000)
-    manager.state = NodeState.LEADER
-    
-    async def mock_replicate(command):
-        await manager.apply_to_state_machine(command)
-        return True
-    
-    manager.replicate_command = mock_replicate
-    
-    await manager.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
-    await manager.acquire_lock("resource_2", LockType.EXCLUSIVE, "client_2")
-    
-    await manager.acquire_lock("resource_2", LockType.EXCLUSIVE, "client_1") 
-    await manager.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_2")  
-    
-    deadlocks = await manager.detect_deadlock()
-    assert len(deadlocks) > 0
\ No newline at end of file
+async def test_deadlock_detection(lock_mgr):
+    await lock_mgr.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_1")
+    await lock_mgr.acquire_lock("resource_2", LockType.EXCLUSIVE, "client_2")
+
+    await lock_mgr.acquire_lock("resource_2", LockType.EXCLUSIVE, "client_1")
+    await lock_mgr.acquire_lock("resource_1", LockType.EXCLUSIVE, "client_2")
+
+    deadlocks = await lock_mgr.detect_deadlock()
+    assert len(deadlocks) > 0
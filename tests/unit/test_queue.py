@@ -1,5 +1,4 @@
 import pytest
-import aiofiles
 import os
 from src.nodes.queue_node import DistributedQueue, ConsistentHash
 
@@ -35,8 +34,9 @@ def test_consistent_hash_node_removal():
     assert remapped < 50
 
 @pytest.mark.asyncio
-async def test_queue_enqueue_dequeue():
-    queue = DistributedQueue("queue_node", "localhost", 8000, immediate_mode=True)
+async def test_queue_enqueue_dequeue(tmp_path):
+    queue = DistributedQueue("queue_node", "localhost", 8000, immediate_mode=True,
+                             log_dir=str(tmp_path))
     queue.initialize_consistent_hash()
     
     msg_id = await queue.enqueue("test_queue", {"data": "test_message"})
@@ -47,12 +47,9 @@ async def test_queue_enqueue_dequeue():
     assert message["data"]["data"] == "test_message"
 
 @pytest.mark.asyncio
-async def test_queue_persistence():
-    log_path = "logs/test_queue_node_queue.log"
-    if os.path.exists(log_path):
-        os.remove(log_path)
-    
-    queue = DistributedQueue("test_queue_node", "localhost", 8000, immediate_mode=True)
+async def test_queue_persistence(tmp_path):
+    queue = DistributedQueue("test_queue_node", "localhost", 8000, immediate_mode=True,
+                             log_dir=str(tmp_path))
     queue.initialize_consistent_hash()
     
     for i in range(10):
@@ -60,9 +57,9 @@ async def test_queue_persistence():
     
     await queue._flush_wal()
     
-    assert os.path.exists(log_path)
+    assert os.path.exists(queue.log_path)
     
-    with open(log_path, 'r') as f:
+    with open(queue.log_path, 'r') as f:
         lines = [line.strip() for line in f if line.strip()]
     
     assert len(lines) == 10
@@ -70,7 +67,4 @@ async def test_queue_persistence():
     queue.queues.clear()
     await queue.recover_from_log()
     
-    assert len(queue.queues["test_queue"]) == 10
-    
-    if os.path.exists(log_path):
-        os.remove(log_path)
\ No newline at end of file
+    assert len(queue.queues["test_queue"]) == 10
\ No newline at end of file
@@ -1,14 +1,25 @@
 import pytest
 import asyncio
-import socket
+import itertools
 from src.consensus.raft import RaftNode, NodeState
 
+# Nodes in these tests never bind real sockets (send_to_peer is mocked and
+# BaseNode.start only opens an HTTP client), so ports are just labels. A
+# counter hands out unique ones without the socket/bind/listen/close dance
+# the old get_free_port did per call.
+_port_pool = itertools.count(40000)
+
 def get_free_port():
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        s.listen(1)
-        port = s.getsockname()[1]
-    return port
+    return next(_port_pool)
+
+async def wait_for_leader(nodes, timeout=2.0):
+    """Return as soon as any node reports an elected leader instead of
+    sleeping through a fixed election window."""
+    tasks = [asyncio.create_task(n.leader_elected_event.wait()) for n in nodes]
+    done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    await asyncio.sleep(0)
 
 @pytest.mark.asyncio
 async def test_election_timeout():
@@ -18,13 +29,12 @@ async def test_election_timeout():
     
     try:
         await node.start()
-        await asyncio.sleep(0.1)
+        await wait_for_leader([node])
         
         assert node.state in [NodeState.LEADER, NodeState.CANDIDATE]
         assert node.current_term > 0
     finally:
         await node.stop()
-        await asyncio.sleep(0.1)
 
 @pytest.mark.asyncio
 async def test_leader_election():
@@ -41,20 +51,22 @@ async def test_leader_election():
             if i != j:
                 node.add_peer(peer.node_id, peer.host, ports[j])
     
-    async def mock_send_to_peer(self, peer_id: str, message: dict):
-        for node in nodes:
-            if node.node_id == peer_id:
-                return await node.process_message(message)
-        return None
+    nodes_by_id = {n.node_id: n for n in nodes}
+    
+    # One compiled coroutine shared by every node instead of a per-node
+    # lambda wrapping it; the sender identity was never used anyway.
+    async def mock_send_to_peer(peer_id: str, message: dict):
+        dest = nodes_by_id.get(peer_id)
+        return await dest.process_message(message) if dest else None
     
     for node in nodes:
-        node.send_to_peer = lambda pid, msg, n=node: mock_send_to_peer(n, pid, msg)
+        node.send_to_peer = mock_send_to_peer
     
     try:
-        for node in nodes:
-            await node.start()
+        # Start the cluster in parallel; setup cost is max(start) not sum.
+        await asyncio.gather(*(node.start() for node in nodes))
         
-        await asyncio.sleep(1.5)
+        await wait_for_leader(nodes)
         
         leaders = [n for n in nodes if n.state == NodeState.LEADER]
         candidates = [n for n in nodes if n.state == NodeState.CANDIDATE]
@@ -70,9 +82,7 @@ async def test_leader_election():
         assert len(leaders) + len(candidates) + len(followers) == 3
         
     finally:
-        for node in nodes:
-            await node.stop()
-        await asyncio.sleep(0.2)
+        await asyncio.gather(*(node.stop() for node in nodes), return_exceptions=True)
 
 @pytest.mark.asyncio
 async def test_single_node_becomes_leader():
@@ -82,7 +92,7 @@ async def test_single_node_becomes_leader():
     try:
         await node.start()
         
-        await asyncio.sleep(0.3)
+        await wait_for_leader([node])
         
         assert node.state in [NodeState.LEADER, NodeState.CANDIDATE]
         assert node.current_term > 0
@@ -99,7 +109,7 @@ async def test_term_increment_on_election():
         initial_term = node.current_term
         await node.start()
         
-        await asyncio.sleep(0.15)
+        await wait_for_leader([node])
         
         assert node.current_term > initial_term
         